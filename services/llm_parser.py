@@ -0,0 +1,151 @@
+"""Phase 4.1: Parser for analytical, structured LLM output.
+
+Kept free of FastAPI/llama.cpp imports so it can be AOT-compiled with mypyc
+(see setup.py); the pure-Python module is used when no compiled build exists.
+"""
+
+import logging
+import re
+from typing import Any, Dict, FrozenSet, List, Optional, Pattern, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Phase 4.1: Section markers and keyword lists used by parse_llm_output, compiled once at import
+_FACTOR_MARKERS: FrozenSet[str] = frozenset({'🔍', 'KEY INSIGHTS', 'Key Insights', 'INSIGHTS:', 'Insights:'})
+_REC_MARKERS: FrozenSet[str] = frozenset({'💡', 'WELLNESS STRATEGY', 'PERSONALIZED', 'Recommendations:', 'RECOMMENDATIONS'})
+_SUMMARY_MARKERS: FrozenSet[str] = frozenset({'🌱', '🎯', '💪', '"'})
+_BULLET_MARKERS: FrozenSet[str] = frozenset({'•', '✓', '-', '1.', '2.', '3.'})
+_FACTOR_TERMS: FrozenSet[str] = frozenset({
+    'cholesterol', 'blood pressure', 'bp', 'heart rate', 'age',
+    'mg/dl', 'mmhg', 'bpm', 'angina', 'risk', 'indicates', 'suggests',
+    'combined', 'relationship', 'correlation', 'physiological'
+})
+_REC_ACTIONS: FrozenSet[str] = frozenset({
+    'reduce', 'increase', 'maintain', 'monitor', 'focus', 'aim',
+    'target', 'consult', 'track', 'avoid', 'include', 'consider',
+    'diet', 'exercise', 'lifestyle', 'stress', 'sodium', 'physical'
+})
+_MEDICAL_TERMS: FrozenSet[str] = frozenset({'cholesterol', 'pressure', 'heart', 'risk', 'age'})
+_BULLET_CHARS: str = '-*•✓123456789. '  # Leading bullet/numbering characters stripped from list items
+
+# Phase 4.1: Contextual defaults when the model output has too few usable items
+_DEFAULT_FACTORS: Tuple[str, ...] = (
+    "Multiple cardiovascular parameters analyzed for risk correlation",
+    "Blood pressure and lipid profile impact arterial health",
+    "Age-related factors influence baseline cardiovascular risk"
+)
+_DEFAULT_RECS: Tuple[str, ...] = (
+    "Focus on heart-healthy Mediterranean-style diet with emphasis on fiber and omega-3s",
+    "Maintain consistent aerobic exercise (150 minutes weekly) to improve cardiovascular efficiency",
+    "Regular monitoring of key biomarkers (BP, lipid panel) for trend analysis"
+)
+
+def _compile_markers(markers: FrozenSet[str]) -> Pattern[str]:
+    return re.compile('|'.join(map(re.escape, sorted(markers))))
+
+_FACTOR_RE: Pattern[str] = _compile_markers(_FACTOR_MARKERS)
+_REC_RE: Pattern[str] = _compile_markers(_REC_MARKERS)
+_SECTION_RE: Pattern[str] = _compile_markers(_FACTOR_MARKERS | _REC_MARKERS | _SUMMARY_MARKERS)  # Any header, checked first
+_BULLET_RE: Pattern[str] = _compile_markers(_BULLET_MARKERS)
+_FACTOR_TERMS_RE: Pattern[str] = _compile_markers(_FACTOR_TERMS)  # Keyword sets are lowercase; match against line.lower()
+_REC_ACTIONS_RE: Pattern[str] = _compile_markers(_REC_ACTIONS)
+_MEDICAL_TERMS_RE: Pattern[str] = _compile_markers(_MEDICAL_TERMS)
+
+def parse_llm_output(text: str) -> Dict[str, Any]:
+    """Phase 4.1: Enhanced parser for analytical, structured LLM output (single pass over the text)"""
+    explanation_parts: List[str] = []
+    explanation_len: int = 0
+    key_factors: List[str] = []
+    recommendations: List[str] = []
+    medical_lines: List[str] = []
+    summary: str = ""
+    
+    current_section: str = "explanation"
+    
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        
+        # Remember the first few distinct lines with medical terms for the key-factor fallback below
+        if len(medical_lines) < 4 and len(line) > 20 and _MEDICAL_TERMS_RE.search(line.lower()):
+            cleaned = line.lstrip(_BULLET_CHARS)
+            if cleaned not in medical_lines:
+                medical_lines.append(cleaned)
+        
+        # Phase 4.1: Enhanced section detection with emojis and headers
+        if _SECTION_RE.search(line):
+            if _FACTOR_RE.search(line):
+                current_section = "factors"
+            elif _REC_RE.search(line):
+                current_section = "recommendations"
+            else:
+                # Motivational closing line
+                current_section = "summary"
+                summary = line.strip('"\'')
+            continue
+        
+        # Skip section headers and formatting
+        if line.startswith('━') or len(line) < 5:
+            continue
+        
+        # Add content to appropriate section
+        if current_section == "explanation":
+            # First few lines are explanation (before structured sections)
+            if explanation_len < 400 and not _BULLET_RE.search(line):
+                explanation_parts.append(line)
+                explanation_len += len(line) + 1
+        
+        elif current_section == "factors":
+            # Extract bullet points or numbered items
+            cleaned = line.lstrip(_BULLET_CHARS)
+            # Phase 4.1: Look for data-specific insights (numbers, mg/dL, mmHg, etc.)
+            if len(cleaned) > 15 and _FACTOR_TERMS_RE.search(cleaned.lower()):
+                key_factors.append(cleaned)
+        
+        elif current_section == "recommendations":
+            # Extract actionable items
+            cleaned = line.lstrip(_BULLET_CHARS)
+            # Phase 4.1: Look for specific, actionable recommendations
+            if len(cleaned) > 15 and _REC_ACTIONS_RE.search(cleaned.lower()):
+                recommendations.append(cleaned)
+    
+    explanation = " ".join(explanation_parts)
+    sentences: Optional[List[str]] = None  # Split on '.' lazily, only if a fallback needs it
+    
+    # Phase 4.1: Enhanced fallback with more contextual defaults
+    if explanation_len < 50:
+        # Try to extract first complete sentence
+        sentences = [s.strip() for s in text.split('.')]
+        first = next((s for s in sentences if len(s) > 30), None)
+        explanation = (first + '.' if first else text[:300]) if text else "Cardiovascular risk assessment completed with detailed parameter analysis."
+    
+    if len(key_factors) < 2:
+        # Extract any lines with medical terms as fallback
+        for cleaned in medical_lines:
+            if cleaned not in key_factors:
+                key_factors.append(cleaned)
+            if len(key_factors) >= 3:
+                break
+    
+    if not key_factors:
+        key_factors = list(_DEFAULT_FACTORS)
+    
+    if len(recommendations) < 2:
+        recommendations = list(_DEFAULT_RECS)
+    
+    if not summary:
+        # Extract last sentence or use fallback
+        if sentences is None:
+            sentences = [s.strip() for s in text.split('.')]
+        last = next((s for s in reversed(sentences) if len(s) > 20), None)
+        summary = last + '.' if last else "Your cardiovascular health data provides actionable insights for risk management."
+    
+    logger.info(f"Parsed: {len(explanation)} chars explanation, {len(key_factors)} factors, {len(recommendations)} recommendations")
+    
+    return {
+        "explanation": explanation.strip()[:500],  # Limit to prevent overflow
+        "key_factors": key_factors[:3],
+        "recommendations": recommendations[:3],
+        "summary": summary.strip()[:200]
+    }
@@ -1,30 +1,112 @@
-﻿from fastapi import FastAPI, HTTPException
+﻿from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Dict, Optional, Any, List
-from llama_cpp import Llama
+from fastapi.responses import ORJSONResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, Field, TypeAdapter
+from sse_starlette.sse import EventSourceResponse, ServerSentEvent
+from typing import Dict, Optional, Any, List, Tuple, Union
+from llama_cpp import Llama, GGML_TYPE_Q8_0
+from llm_parser import parse_llm_output
+from prometheus_client import Counter, Gauge, Histogram, make_asgi_app
+import asyncio
 import logging
+import orjson
+import os
+import platform
+import sys
+import threading
 import time
-from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Cardia LLM Service", version="2.0.0")
+app = FastAPI(title="Cardia LLM Service", version="2.0.0", default_response_class=ORJSONResponse)
+
+app.mount("/metrics", make_asgi_app())
 
 app.add_middleware(CORSMiddleware, allow_origins=["http://localhost:5000", "http://localhost:5173"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
 
-MODEL_PATH = Path(__file__).parent.parent / "server" / "models" / "deepseek-coder-1.3b-instruct.Q4_K_M.gguf"
+MODELS_DIR = Path(__file__).parent.parent / "server" / "models"
+MODEL_PATH_DEFAULT = MODELS_DIR / "deepseek-coder-1.3b-instruct.Q4_K_M.gguf"
+MODEL_PATH_ARM = MODELS_DIR / "deepseek-coder-1.3b-instruct.Q4_0.gguf"  # llama.cpp repacks Q4_0 for SMMLA/dotprod at load time
+IS_ARM = platform.machine().lower() in ("aarch64", "arm64")
+
+def _use_model_path(path: Path):
+    """Point the reported model path/name at the file that actually loaded"""
+    global MODEL_PATH, _MODEL_PATH_STR, _MODEL_STEM, _MODEL_USED
+    MODEL_PATH = path
+    _MODEL_PATH_STR = str(path)
+    _MODEL_STEM = path.stem
+    _MODEL_USED = sys.intern(f"deepseek-coder-1.3b-{_MODEL_STEM.rsplit('.', 1)[-1]}-phase4.1")  # e.g. ...-Q4_K_M-phase4.1
+
+_use_model_path(MODEL_PATH_ARM if IS_ARM and MODEL_PATH_ARM.exists() else MODEL_PATH_DEFAULT)
+
+N_THREADS = min(16, os.cpu_count() or 4)  # llama.cpp scales with cores; capped to avoid oversubscription
+N_CTX = int(os.getenv("N_CTX", "1536"))  # Phase 4.1 prompt (~1000 tokens) + 450 generated tokens
+N_GPU_LAYERS = int(os.getenv("N_GPU_LAYERS", "-1"))  # -1 offloads every layer; ignored by CPU-only builds
 llm = None
 model_loaded = False
+prefix_tokens: List[int] = []  # STATIC_PREFIX tokenized once at startup
+
+# Leading, patient-independent text of the Phase 4.1 prompt (buildContextualPrompt in server/routes/predictONNX.js,
+# kept in sync by test_llm.py). Only callers that send that prompt in `prompt` benefit from the warm-up below;
+# server/routes/explain.js currently sends inputs/prediction, which take the build_prompt fallback
+STATIC_PREFIX = "You are an AI health data analyst for 'Cardia', specializing in cardiovascular risk interpretation.\n\nCONTEXT:\n"
+
+# llama.cpp contexts are not reentrant: run all inference on one worker thread, off the event loop
+_LLM_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm")
+_LLM_SEM = asyncio.Semaphore(1)
+
+# Backpressure: at most LLM_MAX_INFLIGHT requests may wait for or hold the model; the rest get an immediate 503
+LLM_MAX_INFLIGHT = int(os.getenv("LLM_MAX_INFLIGHT", "4"))
+_INFLIGHT = asyncio.BoundedSemaphore(LLM_MAX_INFLIGHT)
+LLM_QUEUE_DEPTH = Gauge("cardia_llm_queue_depth", "Requests waiting for the LLM")
+LLM_QUEUE_WAIT = Histogram("cardia_llm_queue_wait_seconds", "Time spent waiting for the LLM")
+LLM_REJECTED = Counter("cardia_llm_rejected_total", "Requests rejected because the LLM queue was full")
+
+async def _reserve():
+    """Take an inflight slot, or raise 503 if the queue is full"""
+    if _INFLIGHT.locked():
+        LLM_REJECTED.inc()
+        raise HTTPException(503, "LLM service busy, retry later")
+    await _INFLIGHT.acquire()  # Never waits: only reached while a slot is free
+
+@asynccontextmanager
+async def _hold_model():
+    """Wait for the model, recording queue depth and wait time, and hold it for the duration of the block"""
+    LLM_QUEUE_DEPTH.inc()
+    queued_at = time.perf_counter()
+    try:
+        await _LLM_SEM.acquire()
+    finally:
+        LLM_QUEUE_DEPTH.dec()
+    LLM_QUEUE_WAIT.observe(time.perf_counter() - queued_at)
+    try:
+        yield
+    finally:
+        _LLM_SEM.release()
+
+@asynccontextmanager
+async def _admit():
+    """Admit a request to the LLM queue and hold the model for the duration of the block"""
+    await _reserve()
+    try:
+        async with _hold_model():
+            yield
+    finally:
+        _INFLIGHT.release()
 
 class ExplainRequest(BaseModel):
+    # Legacy fields (include_recommendations, max_length) are no longer used; Pydantic drops unknown fields by default
     prompt: Optional[str] = None  # Phase 4: Accept pre-built contextual prompt
     inputs: Optional[Dict[str, Any]] = None
     prediction: Optional[Dict[str, Any]] = None
-    include_recommendations: Optional[bool] = True
-    max_length: Optional[int] = 400
 
 class ExplainResponse(BaseModel):
     explanation: str
@@ -34,6 +116,15 @@ class ExplainResponse(BaseModel):
     processing_time: float
     model_used: str
 
+class ExplainBatchRequest(BaseModel):
+    items: List[ExplainRequest] = Field(min_length=1, max_length=LLM_MAX_INFLIGHT)
+
+class ExplainBatchResponse(BaseModel):
+    results: List[ExplainResponse]
+
+_RESP_ADAPTER = TypeAdapter(ExplainResponse)
+_BATCH_RESP_ADAPTER = TypeAdapter(ExplainBatchResponse)
+
 class HealthResponse(BaseModel):
     status: str
     model_loaded: bool
@@ -41,15 +132,43 @@ class HealthResponse(BaseModel):
     model_path: str
     timestamp: str
 
+def _open_llama(path: Path) -> Llama:
+    return Llama(
+        model_path=str(path),
+        n_ctx=N_CTX,
+        n_batch=2048,             # Prefill the whole Phase 4.1 prompt in one pass
+        n_ubatch=512,
+        n_threads=N_THREADS,
+        n_threads_batch=N_THREADS,
+        n_gpu_layers=N_GPU_LAYERS,
+        main_gpu=0,
+        type_k=GGML_TYPE_Q8_0,    # q8_0 KV cache halves memory traffic per decoded token
+        type_v=GGML_TYPE_Q8_0,
+        flash_attn=True,          # Required by llama.cpp for a quantized V cache
+        verbose=False
+    )
+
 @app.on_event("startup")
 async def load_model():
-    global llm, model_loaded
+    global llm, model_loaded, prefix_tokens
     try:
         logger.info(f"Loading DeepSeek from: {MODEL_PATH}")
         if not MODEL_PATH.exists():
             logger.error(f"Model not found: {MODEL_PATH}")
             return
-        llm = Llama(model_path=str(MODEL_PATH), n_ctx=2048, n_threads=4, n_gpu_layers=0, verbose=False)
+        if MODEL_PATH != MODEL_PATH_DEFAULT:
+            # ARM: try the Q4_0 weights first, but never leave the service without a model
+            try:
+                llm = _open_llama(MODEL_PATH)
+            except Exception as e:
+                logger.warning(f"Failed to load {MODEL_PATH}, falling back to {MODEL_PATH_DEFAULT}: {e}")
+                _use_model_path(MODEL_PATH_DEFAULT)
+        if llm is None:
+            llm = _open_llama(MODEL_PATH)
+        # Prefill the shared Phase 4.1 preamble once. llama-cpp-python keeps the evaluated tokens and only
+        # re-evaluates a prompt past its longest common prefix, so Phase 4.1 prompts skip this part of the prefill
+        prefix_tokens = llm.tokenize(STATIC_PREFIX.encode("utf-8"), special=True)
+        llm.eval(prefix_tokens)
         model_loaded = True
         logger.info("Model loaded successfully")
     except Exception as e:
@@ -59,112 +178,86 @@ async def load_model():
 async def root():
     return {"service": "Cardia LLM", "model": "DeepSeek 1.3B", "status": "running" if model_loaded else "not loaded"}
 
+@lru_cache(maxsize=1)
+def _utc_timestamp(second: int) -> str:
+    """ISO-8601 UTC timestamp, formatted once per second for frequent /health polling"""
+    return datetime.fromtimestamp(second, tz=timezone.utc).isoformat()
+
 @app.get("/health", response_model=HealthResponse)
 async def health():
-    return HealthResponse(status="healthy" if model_loaded else "not loaded", model_loaded=model_loaded, model_name="deepseek-coder-1.3b-instruct.Q4_K_M", model_path=str(MODEL_PATH), timestamp=datetime.utcnow().isoformat())
+    return ORJSONResponse(HealthResponse(status="healthy" if model_loaded else "not loaded", model_loaded=model_loaded, model_name=_MODEL_STEM, model_path=_MODEL_PATH_STR, timestamp=_utc_timestamp(int(time.time()))).model_dump())
 
-def parse_llm_output(text: str) -> Dict[str, Any]:
-    """Phase 4.1: Enhanced parser for analytical, structured LLM output"""
-    lines = [l.strip() for l in text.split('\n') if l.strip()]
-    
-    explanation = ""
-    key_factors = []
-    recommendations = []
-    summary = ""
-    
-    current_section = "explanation"
-    
-    for line in lines:
-        line_lower = line.lower()
-        
-        # Phase 4.1: Enhanced section detection with emojis and headers
-        if any(marker in line for marker in ['🔍', 'KEY INSIGHTS', 'Key Insights', 'INSIGHTS:', 'Insights:']):
-            current_section = "factors"
-            continue
-        elif any(marker in line for marker in ['💡', 'WELLNESS STRATEGY', 'PERSONALIZED', 'Recommendations:', 'RECOMMENDATIONS']):
-            current_section = "recommendations"
-            continue
-        elif any(marker in line for marker in ['🌱', '🎯', '💪', '"']) or (line.startswith('"') and line.endswith('"')):
-            # Motivational closing line
-            current_section = "summary"
-            summary = line.strip('"\'')
-            continue
-        
-        # Skip section headers and formatting
-        if line.startswith('━') or line in ['', ' '] or len(line) < 5:
-            continue
-        
-        # Add content to appropriate section
-        if current_section == "explanation":
-            # First few lines are explanation (before structured sections)
-            if len(explanation) < 400 and not any(marker in line for marker in ['•', '✓', '-', '1.', '2.', '3.']):
-                explanation += line + " "
-        
-        elif current_section == "factors":
-            # Extract bullet points or numbered items
-            cleaned = line.lstrip('-*•✓123456789. ')
-            # Phase 4.1: Look for data-specific insights (numbers, mg/dL, mmHg, etc.)
-            if len(cleaned) > 15 and any(indicator in cleaned.lower() for indicator in [
-                'cholesterol', 'blood pressure', 'bp', 'heart rate', 'age', 
-                'mg/dl', 'mmhg', 'bpm', 'angina', 'risk', 'indicates', 'suggests',
-                'combined', 'relationship', 'correlation', 'physiological'
-            ]):
-                key_factors.append(cleaned)
-        
-        elif current_section == "recommendations":
-            # Extract actionable items
-            cleaned = line.lstrip('-*•✓123456789. ')
-            # Phase 4.1: Look for specific, actionable recommendations
-            if len(cleaned) > 15 and any(action in cleaned.lower() for action in [
-                'reduce', 'increase', 'maintain', 'monitor', 'focus', 'aim', 
-                'target', 'consult', 'track', 'avoid', 'include', 'consider',
-                'diet', 'exercise', 'lifestyle', 'stress', 'sodium', 'physical'
-            ]):
-                recommendations.append(cleaned)
-    
-    # Phase 4.1: Enhanced fallback with more contextual defaults
-    if not explanation or len(explanation) < 50:
-        # Try to extract first complete sentence
-        sentences = [s.strip() for s in text.split('.') if len(s.strip()) > 30]
-        explanation = (sentences[0] + '.' if sentences else text[:300]) if text else "Cardiovascular risk assessment completed with detailed parameter analysis."
-    
-    if not key_factors or len(key_factors) < 2:
-        # Extract any lines with medical terms as fallback
-        for line in lines:
-            if any(term in line.lower() for term in ['cholesterol', 'pressure', 'heart', 'risk', 'age']) and len(line) > 20:
-                cleaned = line.lstrip('-*•✓123456789. ')
-                if cleaned not in key_factors:
-                    key_factors.append(cleaned)
-                if len(key_factors) >= 3:
-                    break
-    
-    if not key_factors:
-        key_factors = [
-            "Multiple cardiovascular parameters analyzed for risk correlation",
-            "Blood pressure and lipid profile impact arterial health",
-            "Age-related factors influence baseline cardiovascular risk"
-        ]
-    
-    if not recommendations or len(recommendations) < 2:
-        recommendations = [
-            "Focus on heart-healthy Mediterranean-style diet with emphasis on fiber and omega-3s",
-            "Maintain consistent aerobic exercise (150 minutes weekly) to improve cardiovascular efficiency",
-            "Regular monitoring of key biomarkers (BP, lipid panel) for trend analysis"
-        ]
-    
-    if not summary:
-        # Extract last sentence or use fallback
-        sentences = [s.strip() for s in text.split('.') if len(s.strip()) > 20]
-        summary = sentences[-1] + '.' if sentences else "Your cardiovascular health data provides actionable insights for risk management."
+# Phase 4.1: Enhanced generation parameters for more creative, analytical responses
+GENERATION_PARAMS = dict(
+    temperature=0.8,          # Higher creativity for varied, insightful responses
+    top_p=0.92,               # Slightly higher for diverse vocabulary
+    top_k=50,                 # Consider more token options for analytical language
+    repeat_penalty=1.15,      # Reduce repetition for more varied insights
+    stop=[                    # Enhanced stop sequences
+        "PATIENT DATA:", 
+        "CONTEXT:",
+        "YOUR ROLE:",
+        "━━━",
+        "###", 
+        "\n\n\n\n",
+        "Note:",
+        "Disclaimer:"
+    ],
+    echo=False
+)
+
+def build_prompt(request: ExplainRequest) -> str:
+    """Phase 4.1: Use the backend's contextual prompt, falling back to a basic one"""
+    if request.prompt:
+        logger.info("Using Phase 4.1 enhanced contextual prompt from backend")
+        return request.prompt
+    risk = request.prediction.get('risk', 0) * 100 if request.prediction else 0
+    return f"Explain heart risk of {risk:.1f}% for patient age {request.inputs.get('age')} with BP {request.inputs.get('restingBP')}."
+
+def tokenize_prompt(prompt: str) -> Union[str, List[int]]:
+    """Splice the pre-tokenized STATIC_PREFIX onto Phase 4.1 prompts so only the patient-specific text is tokenized.
+    Other prompts, including the build_prompt fallback used by server/routes/explain.js, pass through unchanged"""
+    if prefix_tokens and prompt.startswith(STATIC_PREFIX):
+        suffix = prompt[len(STATIC_PREFIX):].encode("utf-8")
+        return prefix_tokens + llm.tokenize(suffix, add_bos=False, special=True)
+    return prompt
+
+# Parsed output for recently seen (prompt, max_tokens) pairs. Only touched on the event loop, so it needs
+# no lock; hits are answered before admission and never wait for the model thread
+RESULT_CACHE_SIZE = 512
+_result_cache: "OrderedDict[Tuple[str, int], Dict[str, Any]]" = OrderedDict()
+
+def _cache_get(key: Tuple[str, int]) -> Optional[Dict[str, Any]]:
+    parsed = _result_cache.get(key)
+    if parsed is not None:
+        _result_cache.move_to_end(key)
+    return parsed
+
+def _cache_put(key: Tuple[str, int], parsed: Dict[str, Any]):
+    _result_cache[key] = parsed
+    _result_cache.move_to_end(key)
+    if len(_result_cache) > RESULT_CACHE_SIZE:
+        _result_cache.popitem(last=False)
+
+def _run(prompt: str, max_tokens: int) -> Dict[str, Any]:
+    """Run the LLM and parse its output"""
+    response = llm(tokenize_prompt(prompt), max_tokens=max_tokens, **GENERATION_PARAMS)
     
-    logger.info(f"Parsed: {len(explanation)} chars explanation, {len(key_factors)} factors, {len(recommendations)} recommendations")
+    generated_text = response['choices'][0]['text'].strip()
+    logger.info(f"Generated {len(generated_text)} characters")
     
-    return {
-        "explanation": explanation.strip()[:500],  # Limit to prevent overflow
-        "key_factors": key_factors[:3],
-        "recommendations": recommendations[:3],
-        "summary": summary.strip()[:200]
-    }
+    # Parse structured output with enhanced extraction
+    return parse_llm_output(generated_text)
+
+def build_response(parsed: Dict[str, Any], processing_time: float) -> ExplainResponse:
+    return ExplainResponse(
+        explanation=parsed['explanation'],
+        key_factors=parsed['key_factors'],
+        recommendations=parsed['recommendations'],
+        summary=parsed['summary'],
+        processing_time=processing_time,
+        model_used=_MODEL_USED
+    )
 
 @app.post("/explain", response_model=ExplainResponse)
 async def explain(request: ExplainRequest):
@@ -173,63 +266,146 @@ async def explain(request: ExplainRequest):
         raise HTTPException(503, "Model not loaded")
     
     try:
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        # Phase 4.1: Use enhanced contextual prompt if provided
-        if request.prompt:
-            prompt = request.prompt
-            logger.info("Using Phase 4.1 enhanced contextual prompt from backend")
-        else:
-            # Fallback to basic prompt building
-            risk = request.prediction.get('risk', 0) * 100 if request.prediction else 0
-            prompt = f"Explain heart risk of {risk:.1f}% for patient age {request.inputs.get('age')} with BP {request.inputs.get('restingBP')}."
+        prompt = build_prompt(request)
         
         logger.info(f"Generating explanation (prompt length: {len(prompt)} chars)")
         
-        # Phase 4.1: Enhanced generation parameters for more creative, analytical responses
-        response = llm(
-            prompt,
-            max_tokens=450,           # Increased for richer insights
-            temperature=0.8,          # Higher creativity for varied, insightful responses
-            top_p=0.92,               # Slightly higher for diverse vocabulary
-            top_k=50,                 # Consider more token options for analytical language
-            repeat_penalty=1.15,      # Reduce repetition for more varied insights
-            stop=[                    # Enhanced stop sequences
-                "PATIENT DATA:", 
-                "CONTEXT:",
-                "YOUR ROLE:",
-                "━━━",
-                "###", 
-                "\n\n\n\n",
-                "Note:",
-                "Disclaimer:"
-            ],
-            echo=False
-        )
-        
-        generated_text = response['choices'][0]['text'].strip()
-        logger.info(f"Generated {len(generated_text)} characters")
-        
-        # Parse structured output with enhanced extraction
-        parsed = parse_llm_output(generated_text)
+        key = (prompt, 450)  # Phase 4.1: 450 tokens for richer insights
+        parsed = _cache_get(key)
+        if parsed is None:
+            loop = asyncio.get_running_loop()
+            async with _admit():
+                parsed = await loop.run_in_executor(_LLM_EXECUTOR, _run, *key)
+            _cache_put(key, parsed)
+        else:
+            logger.info("Serving explanation from cache")
         
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time
         logger.info(f"✅ Phase 4.1 analytical explanation completed in {processing_time:.2f}s")
         
-        return ExplainResponse(
-            explanation=parsed['explanation'],
-            key_factors=parsed['key_factors'],
-            recommendations=parsed['recommendations'],
-            summary=parsed['summary'],
-            processing_time=processing_time,
-            model_used="deepseek-coder-1.3b-Q4_K_M-phase4.1"
-        )
+        result = build_response(parsed, processing_time)
+        # Serialize in pydantic-core directly; returning a Response skips FastAPI's response_model re-validation
+        return Response(_RESP_ADAPTER.dump_json(result), media_type="application/json")
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating Phase 4.1 explanation: {e}")
         raise HTTPException(500, f"Failed to generate explanation: {str(e)}")
 
+@app.post("/explain_batch", response_model=ExplainBatchResponse)
+async def explain_batch(request: ExplainBatchRequest):
+    """Phase 4.1: Generate explanations for up to LLM_MAX_INFLIGHT patients in one request (items are generated one after another)"""
+    if not model_loaded:
+        raise HTTPException(503, "Model not loaded")
+    
+    try:
+        start_time = time.perf_counter()
+        prompts = [build_prompt(item) for item in request.items]
+        logger.info(f"Generating {len(prompts)} explanations in one batch")
+        
+        runs = {}
+        for prompt in prompts:
+            parsed = _cache_get((prompt, 450))
+            if parsed is not None:
+                runs[prompt] = (parsed, time.perf_counter() - start_time)
+        misses = [prompt for prompt in dict.fromkeys(prompts) if prompt not in runs]
+        
+        # Each generated item holds one inflight slot and the model only while it runs, so other requests interleave.
+        # The first item is admitted like /explain (503 when the queue is full); once admitted, later items wait for
+        # a slot instead of failing the batch half-way
+        loop = asyncio.get_running_loop()
+        for i, prompt in enumerate(misses):
+            if i == 0:
+                await _reserve()
+            else:
+                await _INFLIGHT.acquire()
+            try:
+                async with _hold_model():
+                    parsed = await loop.run_in_executor(_LLM_EXECUTOR, _run, prompt, 450)
+            finally:
+                _INFLIGHT.release()
+            _cache_put((prompt, 450), parsed)
+            runs[prompt] = (parsed, time.perf_counter() - start_time)
+        
+        logger.info(f"✅ Phase 4.1 batch of {len(prompts)} explanations completed in {time.perf_counter() - start_time:.2f}s")
+        
+        result = ExplainBatchResponse(results=[build_response(*runs[prompt]) for prompt in prompts])
+        return Response(_BATCH_RESP_ADAPTER.dump_json(result), media_type="application/json")
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating Phase 4.1 batch explanation: {e}")
+        raise HTTPException(500, f"Failed to generate explanations: {str(e)}")
+
+@app.post("/explain/stream")
+async def explain_stream(request: ExplainRequest):
+    """Phase 4.1: Stream the explanation token-by-token as Server-Sent Events"""
+    if not model_loaded:
+        raise HTTPException(503, "Model not loaded")
+    
+    prompt = build_prompt(request)
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    cancelled = threading.Event()
+    
+    def produce():
+        # Runs on the LLM worker thread so the blocking llama.cpp iterator never stalls the event loop
+        try:
+            for chunk in llm(tokenize_prompt(prompt), max_tokens=450, stream=True, **GENERATION_PARAMS):
+                if cancelled.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, chunk['choices'][0]['text'])
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+    
+    async def gen():
+        logger.info(f"Streaming explanation (prompt length: {len(prompt)} chars)")
+        try:
+            async with _hold_model():
+                producer = loop.run_in_executor(_LLM_EXECUTOR, produce)
+                pieces = []
+                try:
+                    while (text := await queue.get()) is not None:
+                        pieces.append(text)
+                        yield ServerSentEvent(data=text)
+                    await producer
+                    # Final event carries the same structured fields as /explain
+                    yield ServerSentEvent(event="result", data=orjson.dumps(parse_llm_output("".join(pieces).strip())).decode())
+                finally:
+                    cancelled.set()  # Client disconnected or stream finished - stop generating
+        except Exception as e:
+            logger.error(f"Error streaming Phase 4.1 explanation: {e}")
+            yield ServerSentEvent(event="error", data=str(e))
+        finally:
+            await release()
+    
+    # Take the inflight slot before the response starts so a full queue is a real 503, as on /explain
+    await _reserve()
+    released = False
+    
+    async def release():
+        # Called from gen() and again after the response, which also covers a client that leaves before gen() starts.
+        # Async so BackgroundTask runs it on the event loop rather than in a worker thread
+        nonlocal released
+        if not released:
+            released = True
+            _INFLIGHT.release()
+    
+    return EventSourceResponse(gen(), headers={"X-Accel-Buffering": "no"}, background=BackgroundTask(release))
+
 if __name__ == "__main__":
     import uvicorn
     print("Starting Cardia LLM Service on port 8000...")
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop="asyncio" if platform.system() == "Windows" else "uvloop",  # uvloop has no Windows build
+        http="httptools",
+        workers=1,                # The Llama model lives in-process and is not fork-safe
+        log_level="warning"
+    )
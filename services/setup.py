@@ -0,0 +1,19 @@
+"""Optional mypyc build of the LLM output parser.
+
+    pip install mypy
+    python setup.py build_ext --inplace
+
+main.py imports llm_parser as usual; the compiled extension takes precedence
+over llm_parser.py when present.
+Rebuild (or delete the .so/.pyd) after editing llm_parser.py, or the stale
+compiled copy keeps being imported.
+"""
+
+from setuptools import setup
+from mypyc.build import mypycify
+
+setup(
+    name="cardia-llm-parser",
+    py_modules=["llm_parser"],
+    ext_modules=mypycify(["llm_parser.py"]),
+)
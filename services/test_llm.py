@@ -7,6 +7,20 @@ Tests the explain endpoint with sample medical data
 import requests
 import json
 import time
+from pathlib import Path
+
+def test_static_prefix_in_sync():
+    """Test that STATIC_PREFIX matches the start of the backend's Phase 4.1 prompt template"""
+    print("🔤 Checking Phase 4.1 prompt prefix...")
+    from main import STATIC_PREFIX
+    
+    template = Path(__file__).parent.parent / "server" / "routes" / "predictONNX.js"
+    if "`" + STATIC_PREFIX in template.read_text(encoding="utf-8"):
+        print("✅ STATIC_PREFIX matches buildContextualPrompt")
+        return True
+    print(f"❌ STATIC_PREFIX no longer matches the prompt template in {template}")
+    print("   Update STATIC_PREFIX in main.py to the new opening of the prompt")
+    return False
 
 def test_llm_health():
     """Test if LLM service is running"""
@@ -90,6 +104,103 @@ def test_llm_explanation():
         print(f"❌ Request failed: {e}")
         return False
 
+def test_llm_stream_explanation():
+    """Test streamed explanation generation (Server-Sent Events)"""
+    print("\n📡 Testing Streamed Explanation...")
+    
+    test_data = {
+        "inputs": {"age": 45, "restingBP": 130},
+        "prediction": {"risk": 0.613}
+    }
+    
+    try:
+        start_time = time.time()
+        response = requests.post(
+            "http://localhost:8000/explain/stream",
+            json=test_data,
+            stream=True,
+            timeout=120
+        )
+        
+        if response.status_code != 200:
+            print(f"❌ Request failed with status {response.status_code}")
+            print(f"   Error: {response.text}")
+            return False
+        
+        # Collect events: "event:" names the next "data:" line, a blank line ends the event
+        chunks = 0
+        event = "message"
+        result = None
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data = line[len("data:"):].lstrip()
+                if event == "result":
+                    result = json.loads(data)
+                elif event == "error":
+                    print(f"❌ Stream reported an error: {data}")
+                    return False
+                else:
+                    chunks += 1
+            elif not line:
+                event = "message"
+        elapsed = time.time() - start_time
+        
+        if result is None:
+            print("❌ Stream ended without a result event")
+            return False
+        missing = [k for k in ('explanation', 'key_factors', 'recommendations', 'summary') if k not in result]
+        if missing:
+            print(f"❌ Result event is missing: {', '.join(missing)}")
+            return False
+        
+        print(f"✅ Streamed {chunks} chunks in {elapsed:.1f} seconds")
+        print(f"   Explanation: {result['explanation'][:100]}...")
+        return True
+            
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Request failed: {e}")
+        return False
+
+def test_llm_batch_explanation():
+    """Test batch explanation generation"""
+    print("\n📦 Testing Batch Explanation Generation...")
+    
+    test_data = {
+        "items": [
+            {"inputs": {"age": 45, "restingBP": 130}, "prediction": {"risk": 0.613}},
+            {"inputs": {"age": 62, "restingBP": 150}, "prediction": {"risk": 0.842}}
+        ]
+    }
+    
+    try:
+        start_time = time.time()
+        response = requests.post(
+            "http://localhost:8000/explain_batch",
+            json=test_data,
+            timeout=240  # Items are generated one after another
+        )
+        elapsed = time.time() - start_time
+        
+        if response.status_code == 200:
+            results = response.json().get('results', [])
+            if len(results) != len(test_data['items']):
+                print(f"❌ Expected {len(test_data['items'])} results, got {len(results)}")
+                return False
+            print(f"✅ {len(results)} explanations generated in {elapsed:.1f} seconds")
+            for i, result in enumerate(results):
+                print(f"   Item {i + 1}: {len(result.get('explanation', ''))} characters, {len(result.get('key_factors', []))} key factors")
+            return True
+        else:
+            print(f"❌ Request failed with status {response.status_code}")
+            print(f"   Error: {response.text}")
+            return False
+            
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Request failed: {e}")
+        return False
+
 def test_backend_integration():
     """Test backend /explain endpoint"""
     print("\n🔗 Testing Backend Integration...")
@@ -138,29 +249,41 @@ def main():
     print("🧪 Cardia LLM Integration Test Suite")
     print("=" * 60)
     
+    # Test 0: Prompt prefix matches the backend template (no service needed)
+    prefix_ok = test_static_prefix_in_sync()
+    
     # Test 1: Health check
     health_ok = test_llm_health()
     
     if not health_ok:
         print("\n❌ LLM service is not running. Please start it with:")
-        print("   cd llm-service && python main.py")
+        print("   cd services && python main.py")
         return
     
     # Test 2: Direct LLM service
     llm_ok = test_llm_explanation()
     
-    # Test 3: Backend integration
+    # Test 3: Streaming endpoint
+    stream_ok = test_llm_stream_explanation()
+    
+    # Test 4: Batch endpoint
+    batch_ok = test_llm_batch_explanation()
+    
+    # Test 5: Backend integration
     backend_ok = test_backend_integration()
     
     # Summary
     print("\n" + "=" * 60)
     print("📊 Test Summary")
     print("=" * 60)
+    print(f"   Prompt Prefix: {'✅' if prefix_ok else '❌'}")
     print(f"   Health Check: {'✅' if health_ok else '❌'}")
     print(f"   LLM Service: {'✅' if llm_ok else '❌'}")
+    print(f"   Streamed Explanation: {'✅' if stream_ok else '❌'}")
+    print(f"   Batch Explanation: {'✅' if batch_ok else '❌'}")
     print(f"   Backend Integration: {'✅' if backend_ok else '❌'}")
     
-    if health_ok and llm_ok and backend_ok:
+    if prefix_ok and health_ok and llm_ok and stream_ok and batch_ok and backend_ok:
         print("\n🎉 All tests passed! LLM integration is working correctly.")
     else:
         print("\n⚠️  Some tests failed. Check the error messages above.")
@@ -15,14 +15,14 @@ if (!(Get-Command python -ErrorAction SilentlyContinue)) {
 $pythonVersion = python --version
 Write-Host "✅ Found: $pythonVersion" -ForegroundColor Green
 
-# Navigate to llm-service directory
-if (!(Test-Path "llm-service")) {
-    Write-Host "❌ llm-service directory not found!" -ForegroundColor Red
+# Navigate to services directory
+if (!(Test-Path "services")) {
+    Write-Host "❌ services directory not found!" -ForegroundColor Red
     Write-Host "   Make sure you're running this from the project root." -ForegroundColor Yellow
     exit 1
 }
 
-Set-Location llm-service
+Set-Location services
 
 Write-Host ""
 Write-Host "📦 Step 1: Creating virtual environment..." -ForegroundColor Yellow
@@ -64,7 +64,7 @@ Write-Host "📋 Next Steps:" -ForegroundColor Yellow
 Write-Host "   1. Run the main startup script: .\start-with-llm.ps1" -ForegroundColor White
 Write-Host "   2. Or manually start services:" -ForegroundColor White
 Write-Host "      - Backend & Frontend: npm run dev" -ForegroundColor Gray
-Write-Host "      - LLM Service: cd llm-service; python main.py" -ForegroundColor Gray
+Write-Host "      - LLM Service: cd services; python main.py" -ForegroundColor Gray
 Write-Host ""
 Write-Host "📖 For more information, see LLM_INTEGRATION.md" -ForegroundColor Gray
 Write-Host ""
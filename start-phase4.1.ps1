@@ -45,7 +45,7 @@ Write-Host ""
 
 # Start LLM Service in new window
 Write-Host "1️⃣  Starting LLM Service (DeepSeek) on port 8000..." -ForegroundColor Green
-Start-Process powershell -ArgumentList "-NoExit", "-Command", "cd '$PSScriptRoot\llm-service'; Write-Host '🧠 LLM Service (DeepSeek)' -ForegroundColor Magenta; python main.py"
+Start-Process powershell -ArgumentList "-NoExit", "-Command", "cd '$PSScriptRoot\services'; Write-Host '🧠 LLM Service (DeepSeek)' -ForegroundColor Magenta; python main.py"
 Start-Sleep -Seconds 5
 
 # Wait for LLM to be ready
@@ -18,14 +18,14 @@ if (!(Get-Command node -ErrorAction SilentlyContinue)) {
 
 Write-Host "📋 Step 1: Checking LLM Service..." -ForegroundColor Yellow
 
-# Check if llm-service directory exists
-if (!(Test-Path "llm-service")) {
-    Write-Host "❌ llm-service directory not found!" -ForegroundColor Red
+# Check if services directory exists
+if (!(Test-Path "services")) {
+    Write-Host "❌ services directory not found!" -ForegroundColor Red
     exit 1
 }
 
 # Check if requirements are installed
-$venvPath = "llm-service\venv\Scripts\python.exe"
+$venvPath = "services\venv\Scripts\python.exe"
 if (Test-Path $venvPath) {
     Write-Host "✅ Found virtual environment" -ForegroundColor Green
     $pythonCmd = $venvPath
@@ -43,7 +43,7 @@ $llmJob = Start-Job -ScriptBlock {
     param($pythonCmd, $workingDir)
     Set-Location $workingDir
     & $pythonCmd main.py
-} -ArgumentList $pythonCmd, (Resolve-Path "llm-service").Path
+} -ArgumentList $pythonCmd, (Resolve-Path "services").Path
 
 Start-Sleep -Seconds 3
 